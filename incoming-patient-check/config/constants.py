@@ -10,6 +10,7 @@ DEFAULT_DB_HOST: Final[str] = 'localhost'
 DEFAULT_DB_PORT: Final[int] = 3306
 DEFAULT_DB_CHARSET: Final[str] = 'utf8mb4'
 DEFAULT_DB_COLLATION: Final[str] = 'utf8mb4_turkish_ci'
+DEFAULT_DB_POOL_SIZE: Final[int] = 1  # DB başına bağlantılar sıralı kullanılır
 
 # HIYS API Configuration
 DEFAULT_HIYS_BASE_URL: Final[str] = 'https://prtk.gen.tr/HIYS/crm'
@@ -17,6 +18,15 @@ DEFAULT_HIYS_TIMEOUT: Final[int] = 30
 DEFAULT_HIYS_MAX_RETRIES: Final[int] = 3
 DEFAULT_HIYS_REQUEST_DELAY: Final[float] = 0
 HIYS_BATCH_SIZE: Final[int] = 10
+HIYS_CONNECTION_POOL_SIZE: Final[int] = 32
+HIYS_MAX_CONCURRENCY: Final[int] = 16
+HIYS_MAX_REQUESTS_PER_SECOND: Final[float] = 20.0  # 0 = sınırsız
+HIYS_CACHE_MAX_SIZE: Final[int] = 10000
+HIYS_PATIENT_DETAILS_CACHE_TTL: Final[int] = 300  # saniye
+HIYS_TRANSACTIONS_CACHE_TTL: Final[int] = 60  # saniye
+HIYS_LATENCY_EMA_ALPHA: Final[float] = 0.2
+HIYS_BATCH_DELAY_LATENCY_FACTOR: Final[float] = 0.5
+HIYS_MIN_BATCH_DELAY: Final[float] = 0.0  # saniye; Retry-After yoksa ek bekleme yok
 ENABLE_HIYS_ENRICHMENT_DEFAULT: Final[bool] = True
 
 # Service Configuration
@@ -30,6 +40,7 @@ DEFAULT_BATCH_SIZE: Final[int] = 1000
 DEFAULT_TEST_RECORD_LIMIT: Final[int] = 200
 TEST_BATCH_SIZE: Final[int] = 10
 RECENT_TRANSACTIONS_DAYS: Final[int] = 90
+TRANSACTION_EARLY_BREAK_MIN_COUNT: Final[int] = 32
 CLEANUP_DAYS: Final[int] = 90
 
 # Test Mode Configuration
@@ -38,6 +49,8 @@ TEST_CLEANUP_DAYS_DEFAULT: Final[int] = 90
 
 # Batch Processing
 DEFAULT_SAVE_BATCH_SIZE: Final[int] = 100
+DEFAULT_COMMIT_CHUNK_SIZE: Final[int] = 500
+USER_PATIENT_QUERY_CHUNK_SIZE: Final[int] = 1000
 
 # Logging Configuration
 DEFAULT_LOG_LEVEL: Final[str] = 'DEBUG'
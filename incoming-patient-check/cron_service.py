@@ -258,7 +258,7 @@ class CronServiceCoordinator:
             self.logger.info(f"Starting {service_name}...")
             self.logger.debug(f"Command: {' '.join(cmd)}")
 
-            start_time = time.time()
+            start_time = time.monotonic()
             result = subprocess.run(
                 cmd,
                 cwd=str(project_root),
@@ -267,7 +267,7 @@ class CronServiceCoordinator:
                 timeout=3600  # 1 saat timeout
             )
 
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
 
             if result.returncode == 0:
                 self.logger.info(f"{service_name} completed successfully in {duration:.2f} seconds")
@@ -292,7 +292,7 @@ class CronServiceCoordinator:
             return False
 
     def run(self):
-        overall_start_time = time.time()
+        overall_start_time = time.monotonic()
         self.logger.info("Cron Service Coordinator started")
 
         results = {
@@ -338,7 +338,7 @@ class CronServiceCoordinator:
                 else:
                     self.logger.info(f"{service_name.replace('_', ' ').title()}: DISABLED")
 
-            overall_duration = time.time() - overall_start_time
+            overall_duration = time.monotonic() - overall_start_time
 
             if overall_success:
                 self.logger.info(f"All enabled services completed successfully in {overall_duration:.2f} seconds")
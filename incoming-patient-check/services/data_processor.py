@@ -244,10 +244,8 @@ class DataProcessor:
                     user=hospital_config.get('username'),
                     password=hospital_config.get('password'),
                     host=hospital_config.get('host', 'localhost')
-                ) as db_service:
-                    
-                    # Database service'i ile HIYS API service'i oluştur
-                    hiys_api = HIYSAPIService(database_service=db_service)
+                ) as db_service, HIYSAPIService(database_service=db_service) as hiys_api:
+                    # HIYS servisi çıkışta session ve thread pool'unu kapatır
                     
                     enriched_patients = []
                     
@@ -10,7 +10,7 @@ from mysql.connector import Error
 from models.data_models import FinalProcessedData
 from config.constants import (
     DEFAULT_DB_HOST, DEFAULT_DB_PORT, DEFAULT_DB_CHARSET, DEFAULT_DB_COLLATION,
-    DEFAULT_SAVE_BATCH_SIZE, RECENT_TRANSACTIONS_DAYS, DEFAULT_DB_USER, DEFAULT_DB_PASSWORD,
+    DEFAULT_SAVE_BATCH_SIZE, DEFAULT_COMMIT_CHUNK_SIZE, RECENT_TRANSACTIONS_DAYS, DEFAULT_DB_USER, DEFAULT_DB_PASSWORD,
     MAX_CHAT_TYPE_LENGTH, MAX_LANGUAGE_LENGTH, MAX_PHONE_NUMBER_LENGTH,
     MAX_UPN_LENGTH, MAX_TCKN_LENGTH, MAX_NAME_LENGTH, MAX_DOCTOR_NAME_LENGTH,
     MAX_CLINIC_NAME_LENGTH, MAX_SPECIALTY_LENGTH, MAX_GENDER_LENGTH,
@@ -400,7 +400,7 @@ class DatabaseSaveService:
                             transaction_date = getattr(
                                 t, 'TransactionDate', '')
                             dr_name = getattr(t, 'DrName', '')
-                            transaction_id = f"tx_{i}_{hash(f'{transaction_date}_{dr_name}') % 100000}"
+                            transaction_id = f"tx_{i}_{transaction_date}_{dr_name}"
 
                         transactions_dict[str(transaction_id)] = {
                             'TransactionID': transaction_id,
@@ -599,6 +599,7 @@ class DatabaseSaveService:
         skipped = 0
         failed = 0
         updated_records = 0
+        pending_writes = 0
 
         try:
             self.logger.info(f"🔗 Connecting to database: {db_name}")
@@ -614,6 +615,8 @@ class DatabaseSaveService:
                         cursor, timestamp, app_id, patient, db_name)
 
                     if result is True:
+                        if action in ('inserted', 'updated'):
+                            pending_writes += 1
                         if action == 'inserted':
                             new_records_saved += 1
                             self.run_stats.add_new()  # Track globally
@@ -644,6 +647,13 @@ class DatabaseSaveService:
                     failed += 1
                     self.run_stats.add_failed()  # Track globally
 
+                # Uzun transaction'ları ve satır kilitlerini sınırlamak için parça parça commit
+                if pending_writes >= DEFAULT_COMMIT_CHUNK_SIZE:
+                    connection.commit()
+                    self.logger.debug(
+                        f"Committed chunk of {pending_writes} writes to {db_name}")
+                    pending_writes = 0
+
             self.logger.info(
                 f"🔄 Committing batch to {db_name}: {new_records_saved} new records, {updated_records} updated, {skipped} skipped, {failed} failed")
             connection.commit()
@@ -748,30 +758,13 @@ class DatabaseSaveService:
                     f"⏭️ Skipping patient {patient.userPatientId}: No patient details from HIYS")
                 return True, 'skipped'
 
-            recent_transactions = []
-            cutoff_date = datetime.now() - timedelta(days=90)
-
-            for transaction in transactions:
-                try:
-                    if hasattr(transaction, 'TransactionDate') and transaction.TransactionDate:
-                        trans_date = datetime.fromisoformat(
-                            transaction.TransactionDate.replace('T', ' ').split('.')[0])
-                        if trans_date >= cutoff_date:
-                            recent_transactions.append(transaction)
-                except Exception as e:
-                    self.logger.debug(f"Error parsing transaction date: {e}")
-                    continue
-
-            if not recent_transactions:
-                self.logger.info(
-                    f"⏭️ Skipping patient {patient.userPatientId}: No recent transactions in last 90 days (total transactions: {len(transactions)})")
-                return True, 'skipped'
-
+            # Transaction'lar HIYSAPIService._filter_recent_transactions tarafından
+            # son RECENT_TRANSACTIONS_DAYS gün ve ilk mesaj tarihine göre zaten filtrelendi
             self.logger.debug(
                 f"✅ Patient {patient.userPatientId} passed quality filters:")
             self.logger.debug(f"  - HIYS Patient Found: ✅")
             self.logger.debug(
-                f"  - HIYS Transactions Found: ✅ ({len(recent_transactions)} recent)")
+                f"  - HIYS Transactions Found: ✅ ({len(transactions)} recent)")
             self.logger.debug(f"  - Patient Details: ✅")
             self.logger.debug(f"  - Recent Transactions: ✅")
 
@@ -787,7 +780,6 @@ class DatabaseSaveService:
             else:
                 self.logger.debug(f"  - No patient details available")
 
-            transactions = recent_transactions
             son_islem_tarihi = None
             son_doktor_adi = None
             son_poliklinik = None
@@ -833,7 +825,7 @@ class DatabaseSaveService:
                             transaction_date = getattr(
                                 t, 'TransactionDate', '')
                             dr_name = getattr(t, 'DrName', '')
-                            transaction_id = f"tx_{i}_{hash(f'{transaction_date}_{dr_name}') % 100000}"
+                            transaction_id = f"tx_{i}_{transaction_date}_{dr_name}"
 
                         transactions_dict[str(transaction_id)] = {
                             "TransactionID": transaction_id,
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
 import os
-import mysql.connector
 from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from models.data_models import ChatListEntry, UserPatient, CrmHospital
 from config.constants import (
-    TEST_MODE_DEFAULT, DEFAULT_TEST_RECORD_LIMIT, RECENT_TRANSACTIONS_DAYS
+    TEST_MODE_DEFAULT, DEFAULT_TEST_RECORD_LIMIT, RECENT_TRANSACTIONS_DAYS,
+    DEFAULT_DB_POOL_SIZE, USER_PATIENT_QUERY_CHUNK_SIZE
+)
+
+# Sabit boyutlu IN listesi: her parça aynı prepared statement ile çalışır
+_USER_PATIENT_INFO_QUERY = (
+    "SELECT id, language, phoneNumber FROM userpatient WHERE id IN ("
+    + ",".join(["%s"] * USER_PATIENT_QUERY_CHUNK_SIZE)
+    + ")"
 )
 
 
 class DatabaseService:
+    # (host, port, database, user) -> bağlantı havuzu; süreç boyunca paylaşılır
+    _pools: Dict[Tuple[str, int, str, str], MySQLConnectionPool] = {}
+
     def __init__(self, database: str, user: str, password: str, host: str = 'localhost', port: int = 3306):
         self.database = database
         self.user = user
@@ -21,6 +32,10 @@ class DatabaseService:
         self.port = port
         self.connection = None
         self.logger = logging.getLogger(__name__)
+        # dbName -> appId eşlemesi çalışma boyunca değişmez
+        self._appid_cache: Dict[str, Optional[str]] = {}
+        # dictionary flag -> bağlantı boyunca tekrar kullanılan cursor
+        self._cursors: Dict[bool, Any] = {}
         self._check_test_mode()
 
     def __enter__(self):
@@ -43,19 +58,35 @@ class DatabaseService:
         else:
             self.logger.debug("DATABASE SERVICE: Production mode")
 
-    def connect(self) -> bool:
-        try:
-            self.connection = mysql.connector.connect(
+    def _get_pool(self) -> MySQLConnectionPool:
+        key = (self.host, self.port, self.database, self.user)
+        pool = DatabaseService._pools.get(key)
+        if pool is None:
+            pool = MySQLConnectionPool(
+                pool_name=f"dbservice_{len(DatabaseService._pools)}",
+                pool_size=DEFAULT_DB_POOL_SIZE,
                 host=self.host,
+                port=self.port,
                 user=self.user,
                 password=self.password,
                 database=self.database,
                 charset='utf8mb4'
             )
+            DatabaseService._pools[key] = pool
+            self.logger.debug(
+                f"Connection pool created for {self.database} (size: {DEFAULT_DB_POOL_SIZE})")
+        return pool
+
+    def connect(self) -> bool:
+        self._close_cursor()
+        try:
+            self.connection = self._get_pool().get_connection()
             if self.connection.is_connected():
                 self.logger.info(
                     f"Successfully connected to database: {self.database}")
                 return True
+            # Başarısız bağlantı da havuza iade edilir
+            self.disconnect()
             return False
         except Error as e:
             self.logger.error(
@@ -63,10 +94,37 @@ class DatabaseService:
             return False
 
     def disconnect(self):
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            self.logger.info(
-                f"Database connection closed for: {self.database}")
+        self._close_cursor()
+        if self.connection:
+            # Havuzdan alınan bağlantı kapatılmaz, havuza geri döner. Kopmuş
+            # bağlantı da iade edilir (havuz tükenmesin); havuz sonraki
+            # get_connection'da yeniden bağlanır.
+            try:
+                self.connection.close()
+                self.logger.info(
+                    f"Database connection released for: {self.database}")
+            except Error as e:
+                self.logger.warning(
+                    f"Error releasing connection for {self.database}: {e}")
+            finally:
+                self.connection = None
+
+    def _get_cursor(self, dictionary: bool = True):
+        """Bağlantı boyunca tekrar kullanılan cursor'u döndür"""
+        cursor = self._cursors.get(dictionary)
+        if cursor is None:
+            # buffered=True: fetchone() sonrası okunmamış satır kalmaz
+            cursor = self.connection.cursor(dictionary=dictionary, buffered=True)
+            self._cursors[dictionary] = cursor
+        return cursor
+
+    def _close_cursor(self):
+        for cursor in self._cursors.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+        self._cursors.clear()
 
     def get_chatlist_data(self, days_back: int = RECENT_TRANSACTIONS_DAYS) -> List[Dict[str, Any]]:
         if not self.connection or not self.connection.is_connected():
@@ -74,7 +132,7 @@ class DatabaseService:
             return []
 
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = self._get_cursor()
             start_date = datetime.now() - timedelta(days=days_back)
             start_date_str = start_date.strftime('%Y-%m-%d')
             query = """
@@ -106,8 +164,6 @@ class DatabaseService:
                 self.logger.info(
                     f"Retrieved {len(results)} unique chat records from {self.database}")
 
-            cursor.close()
-
             return results
 
         except Error as e:
@@ -124,26 +180,22 @@ class DatabaseService:
             return {}
 
         try:
-            cursor = self.connection.cursor(dictionary=True)
-
-            # IN clause için placeholder oluştur
-            placeholders = ','.join(['%s'] * len(user_patient_ids))
-            query = f"""
-            SELECT id, language, phoneNumber 
-            FROM userpatient 
-            WHERE id IN ({placeholders})
-            """
-
-            cursor.execute(query, user_patient_ids)
-            results = cursor.fetchall()
-
-            patient_info_map = {
-                row['id']: {
-                    'language': row['language'],
-                    'phoneNumber': row['phoneNumber']
-                }
-                for row in results
-            }
+            # Prepared cursor: sorgu sunucuda bir kez parse edilir, parçalar boyunca tekrar kullanılır
+            cursor = self.connection.cursor(prepared=True)
+
+            patient_info_map = {}
+            chunk_size = USER_PATIENT_QUERY_CHUNK_SIZE
+            for start in range(0, len(user_patient_ids), chunk_size):
+                chunk = list(user_patient_ids[start:start + chunk_size])
+                # Son parçayı ilk id ile doldur; IN listesinde tekrar sonucu değiştirmez
+                chunk.extend([chunk[0]] * (chunk_size - len(chunk)))
+
+                cursor.execute(_USER_PATIENT_INFO_QUERY, chunk)
+                for patient_id, language, phone_number in cursor:
+                    patient_info_map[patient_id] = {
+                        'language': language,
+                        'phoneNumber': phone_number
+                    }
 
             self.logger.info(
                 f"Retrieved patient info for {len(patient_info_map)} patients from {self.database}")
@@ -157,25 +209,29 @@ class DatabaseService:
             return {}
 
     def get_hospital_app_id(self, db_name: str) -> Optional[str]:
+        if db_name in self._appid_cache:
+            return self._appid_cache[db_name]
+
         if not self.connection or not self.connection.is_connected():
             self.logger.error("Database connection not established")
             return None
 
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = self._get_cursor(dictionary=False)
 
             query = "SELECT appId FROM crmhospitals WHERE dbName = %s LIMIT 1"
             cursor.execute(query, (db_name,))
             result = cursor.fetchone()
 
-            cursor.close()
-
             if result:
                 self.logger.info(f"Retrieved appId for database {db_name}")
-                return result['appId']
+                app_id = result[0]
             else:
                 self.logger.warning(f"No appId found for database {db_name}")
-                return None
+                app_id = None
+
+            self._appid_cache[db_name] = app_id
+            return app_id
 
         except Error as e:
             self.logger.error(
@@ -189,7 +245,7 @@ class DatabaseService:
             return None
 
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = self._get_cursor(dictionary=False)
 
             query = """
             SELECT MIN(dateTime) as first_message_date 
@@ -197,13 +253,12 @@ class DatabaseService:
             WHERE userPatientId = %s AND dateTime IS NOT NULL
             """
             cursor.execute(query, (user_patient_id,))
-            result = cursor.fetchone()
-
-            cursor.close()
+            row = cursor.fetchone()
+            first_message_date = row[0] if row else None
 
-            if result and result['first_message_date']:
-                self.logger.debug(f"First message date for patient {user_patient_id}: {result['first_message_date']}")
-                return result['first_message_date']
+            if first_message_date:
+                self.logger.debug(f"First message date for patient {user_patient_id}: {first_message_date}")
+                return first_message_date
             else:
                 self.logger.debug(f"No message date found for patient {user_patient_id}")
                 return None
@@ -212,3 +267,39 @@ class DatabaseService:
             self.logger.error(
                 f"Error fetching first message date for patient {user_patient_id}: {e}")
             return None
+
+    def get_first_message_dates_for_patients(self, user_patient_ids: List[int]) -> Dict[int, datetime]:
+        """Birden fazla userPatientId için ilk mesaj tarihlerini tek sorguda getir"""
+        if not self.connection or not self.connection.is_connected():
+            self.logger.error("Database connection not established")
+            return {}
+
+        if not user_patient_ids:
+            return {}
+
+        try:
+            cursor = self._get_cursor(dictionary=False)
+
+            placeholders = ','.join(['%s'] * len(user_patient_ids))
+            query = f"""
+            SELECT userPatientId, MIN(dateTime) as first_message_date 
+            FROM chatlist 
+            WHERE userPatientId IN ({placeholders}) AND dateTime IS NOT NULL
+            GROUP BY userPatientId
+            """
+            cursor.execute(query, list(user_patient_ids))
+
+            first_message_dates = {
+                user_patient_id: first_message_date
+                for user_patient_id, first_message_date in cursor.fetchall()
+                if first_message_date
+            }
+
+            self.logger.debug(
+                f"First message dates found for {len(first_message_dates)}/{len(user_patient_ids)} patients")
+            return first_message_dates
+
+        except Error as e:
+            self.logger.error(
+                f"Error fetching first message dates from {self.database}: {e}")
+            return {}
@@ -1,20 +1,38 @@
 from __future__ import annotations
 
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import os
+import threading
 from typing import Dict, Any, List, Optional
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from models.data_models import (
-    PatientData, PatientDetailResponse, TransactionResponse,
+    PatientData, PatientDetail, PatientDetailResponse, TransactionResponse,
     EnrichedPatientData, Transaction
 )
 from config.constants import (
     DEFAULT_HIYS_BASE_URL, DEFAULT_HIYS_TIMEOUT, DEFAULT_HIYS_MAX_RETRIES,
-    DEFAULT_HIYS_REQUEST_DELAY, HTTP_CLIENT_ERROR_START, HTTP_CLIENT_ERROR_END,
-    RECENT_TRANSACTIONS_DAYS, HIYS_BATCH_SIZE
+    DEFAULT_HIYS_REQUEST_DELAY,
+    RECENT_TRANSACTIONS_DAYS, HIYS_BATCH_SIZE, HIYS_CONNECTION_POOL_SIZE,
+    HIYS_MAX_CONCURRENCY, HIYS_MAX_REQUESTS_PER_SECOND, HIYS_CACHE_MAX_SIZE,
+    HIYS_PATIENT_DETAILS_CACHE_TTL, HIYS_TRANSACTIONS_CACHE_TTL,
+    TRANSACTION_EARLY_BREAK_MIN_COUNT, HIYS_LATENCY_EMA_ALPHA,
+    HTTP_CLIENT_ERROR_START, HTTP_CLIENT_ERROR_END,
+    HIYS_BATCH_DELAY_LATENCY_FACTOR, HIYS_MIN_BATCH_DELAY
 )
+from utils.rate_limiter import TokenBucket
+from utils.ttl_cache import TTLCache
+
+# urllib3 Retry ile tekrarlanan HTTP durum kodları
+_RETRY_STATUSES = (500, 502, 503, 504)
+
+# enrich_patient_data için "ilk mesaj tarihi henüz sorgulanmadı" işareti
+_UNRESOLVED = object()
 
 
 class HIYSAPIService:
@@ -31,7 +49,52 @@ class HIYSAPIService:
         self.request_delay = request_delay or DEFAULT_HIYS_REQUEST_DELAY
 
         self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
+        })
+
+        # max_retries toplam deneme sayısıdır: ilk istek + (max_retries - 1) tekrar.
+        # 4xx hataları tekrarlanmaz; 5xx, bağlantı ve okuma hataları backoff ile tekrarlanır
+        retry = Retry(
+            total=max(self.max_retries - 1, 0),
+            connect=max(self.max_retries - 1, 0),
+            read=max(self.max_retries - 1, 0),
+            status_forcelist=_RETRY_STATUSES,
+            backoff_factor=self.request_delay,
+            raise_on_status=False,
+            allowed_methods=frozenset(['POST'])
+        )
+
+        # Tek host, iki endpoint: keep-alive soketlerini sıcak tut. Havuz,
+        # eşzamanlı worker sayısından küçük olmamalı
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=max(HIYS_BATCH_SIZE, HIYS_CONNECTION_POOL_SIZE, HIYS_MAX_CONCURRENCY),
+            pool_block=False,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # İstek temposu her istek sonrası sleep yerine global RPS ile sınırlanır
+        self._rate_limiter = TokenBucket(HIYS_MAX_REQUESTS_PER_SECOND)
+
+        # Aynı telefon/UPN için tekrarlanan sorgular parse edilmiş modellerle bellekten döner
+        self._patient_details_cache = TTLCache(
+            HIYS_CACHE_MAX_SIZE, HIYS_PATIENT_DETAILS_CACHE_TTL)
+        self._transactions_cache = TTLCache(
+            HIYS_CACHE_MAX_SIZE, HIYS_TRANSACTIONS_CACHE_TTL)
+
+        # Batch arası bekleme sabit değil: başarılı isteklerin gecikme ortalaması
+        # (EMA) ve 429 yanıtlarındaki Retry-After başlığı ile belirlenir
+        self._latency_lock = threading.Lock()
+        self._ema_latency: Optional[float] = None
+        self._retry_after = 0.0
+
+        # Batch'ler arasında yeniden kullanılan worker havuzu
+        self._executor = ThreadPoolExecutor(
+            max_workers=HIYS_MAX_CONCURRENCY, thread_name_prefix='hiys')
 
         self.logger.info(
             f"HIYS API Service initialized - timeout: {self.timeout}s, retries: {self.max_retries}, delay: {self.request_delay}s")
@@ -42,75 +105,82 @@ class HIYSAPIService:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager cleanup"""
-        self.session.close()
-
-    def _make_request(self, url: str, payload: Dict[str, Any], operation: str) -> Optional[Dict[str, Any]]:
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                self.logger.debug(
-                    f"{operation} - Attempt {attempt}/{self.max_retries}")
-
-                response = self.session.post(
-                    url,
-                    json=payload,
-                    timeout=self.timeout
-                )
+        self.close()
 
-                response.raise_for_status()
-                result = response.json()
-                time.sleep(self.request_delay)
+    def close(self):
+        """Thread pool ve HTTP session'ı kapat"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
 
-                return result
+    def _make_request(self, url: str, payload: Dict[str, Any], operation: str) -> Optional[bytes]:
+        try:
+            self._rate_limiter.acquire()
+            started = time.monotonic()
+            response = self.session.post(
+                url,
+                json=payload,
+                timeout=self.timeout
+            )
 
-            except requests.exceptions.Timeout as e:
-                self.logger.warning(
-                    f"{operation} - Timeout on attempt {attempt}/{self.max_retries} (timeout: {self.timeout}s)")
-                if attempt == self.max_retries:
-                    self.logger.error(
-                        f"{operation} - All retry attempts failed due to timeout after {self.timeout}s")
-                    return None
-                time.sleep(self.request_delay * attempt)
+            if response.status_code == 429:
+                self._record_retry_after(response.headers.get('Retry-After'))
+            response.raise_for_status()
+            self._record_latency(time.monotonic() - started)
+            # Ham gövde döner; parse ve validasyon pydantic-core ile tek adımda yapılır
+            return response.content
 
-            except requests.exceptions.HTTPError as e:
-                status_code = e.response.status_code if e.response else "Unknown"
-                self.logger.warning(
-                    f"{operation} - HTTP error on attempt {attempt}/{self.max_retries}: [{status_code}] {e}")
-
-                if e.response and HTTP_CLIENT_ERROR_START <= e.response.status_code < HTTP_CLIENT_ERROR_END:
-                    self.logger.error(
-                        f"{operation} - Client error, not retrying: {e}")
-                    return None
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code is not None and HTTP_CLIENT_ERROR_START <= status_code < HTTP_CLIENT_ERROR_END:
+                self.logger.error(
+                    f"{operation} - Client error [{status_code}], not retrying: {e}")
+            elif status_code in _RETRY_STATUSES:
+                self.logger.error(
+                    f"{operation} - HTTP error [{status_code}] after {self.max_retries} attempts: {e}")
+            else:
+                self.logger.error(
+                    f"{operation} - HTTP error [{status_code}]: {e}")
+            return None
 
-                if attempt == self.max_retries:
-                    self.logger.error(
-                        f"{operation} - All retry attempts failed: {e}")
-                    return None
-                time.sleep(self.request_delay * attempt)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Bağlantı/okuma hataları adapter'daki urllib3 Retry ile zaten tekrarlandı
+            self.logger.error(
+                f"{operation} - Request failed after {self.max_retries} attempts: {e}")
+            return None
 
-            except requests.exceptions.ConnectionError as e:
-                self.logger.warning(
-                    f"{operation} - Connection error on attempt {attempt}/{self.max_retries}: {e}")
-                if attempt == self.max_retries:
-                    self.logger.error(
-                        f"{operation} - All retry attempts failed due to connection issues: {e}")
-                    return None
-                time.sleep(self.request_delay * attempt)
+        except requests.exceptions.RequestException as e:
+            self.logger.error(
+                f"{operation} - Request failed: {e}")
+            return None
 
-            except requests.exceptions.RequestException as e:
-                self.logger.warning(
-                    f"{operation} - Request error on attempt {attempt}/{self.max_retries}: {e}")
-                if attempt == self.max_retries:
-                    self.logger.error(
-                        f"{operation} - All retry attempts failed: {e}")
-                    return None
-                time.sleep(self.request_delay * attempt)
+        except Exception as e:
+            self.logger.error(
+                f"{operation} - Unexpected error: {e}", exc_info=True)
+            return None
 
-            except Exception as e:
-                self.logger.error(
-                    f"{operation} - Unexpected error on attempt {attempt}: {e}", exc_info=True)
-                return None
+    def _record_latency(self, latency: float) -> None:
+        with self._latency_lock:
+            if self._ema_latency is None:
+                self._ema_latency = latency
+            else:
+                self._ema_latency += HIYS_LATENCY_EMA_ALPHA * (latency - self._ema_latency)
 
-        return None
+    def _record_retry_after(self, header: Optional[str]) -> None:
+        # Sadece saniye cinsinden değer desteklenir (HTTP-date yok sayılır)
+        try:
+            delay = float(header)
+        except (TypeError, ValueError):
+            return
+        with self._latency_lock:
+            self._retry_after = max(self._retry_after, delay)
+
+    def _next_batch_delay(self) -> float:
+        with self._latency_lock:
+            if self._retry_after > 0:
+                delay, self._retry_after = self._retry_after, 0.0
+                return delay
+            ema_latency = self._ema_latency or 0.0
+        return max(HIYS_MIN_BATCH_DELAY, ema_latency * HIYS_BATCH_DELAY_LATENCY_FACTOR)
 
     def _filter_recent_transactions(self, transactions: List[Transaction], days_back: int = RECENT_TRANSACTIONS_DAYS, first_message_date: Optional[datetime] = None) -> List[Transaction]:
         if not transactions:
@@ -120,53 +190,109 @@ class HIYSAPIService:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
 
+        # 'YYYY-MM-DD' önekleri sözlük sırasıyla karşılaştırılabilir: aralık dışı
+        # satırlar parse edilmeden elenir
+        start_prefix = start_date.strftime('%Y-%m-%d')
+        end_prefix = end_date.strftime('%Y-%m-%d')
+        first_message_prefix = first_message_date.strftime(
+            '%Y-%m-%d') if first_message_date else None
+
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        # Sıcak döngüde attribute aramalarını azaltmak için yerel referanslar
+        debug = self.logger.debug
+        warning = self.logger.warning
+        total_count = len(transactions)
+
+        # HIYS işlemleri genellikle yeniden eskiye sıralı döner. Tüm liste
+        # önekleri üzerinden tek geçişle sıralı olduğu doğrulanırsa, alt sınırın
+        # altına inildiğinde kalan satırlar taranmaz (hepsi daha eski). Küçük
+        # listelerde kontrole gerek yok.
+        lower_prefix = max(start_prefix, first_message_prefix or '')
+        sorted_desc = False
+        if total_count >= TRANSACTION_EARLY_BREAK_MIN_COUNT:
+            prefixes = [
+                (transaction.TransactionDate or '')[:10] for transaction in transactions]
+            sorted_desc = all(
+                len(prefix) == 10 and prefix[4] == '-' for prefix in prefixes
+            ) and all(
+                newer >= older for newer, older in zip(prefixes, prefixes[1:]))
+
         filtered_transactions = []
+        append = filtered_transactions.append
         skipped_count = 0
         skipped_by_message_date = 0
 
-        for transaction in transactions:
+        for index, transaction in enumerate(transactions):
             transaction_date_str = transaction.TransactionDate
 
             if not transaction_date_str:
                 skipped_count += 1
                 continue
 
+            if len(transaction_date_str) >= 10 and transaction_date_str[4] == '-':
+                date_prefix = transaction_date_str[:10]
+
+                if sorted_desc and date_prefix < lower_prefix:
+                    remaining = total_count - index
+                    if first_message_prefix and date_prefix < first_message_prefix:
+                        skipped_by_message_date += remaining
+                    else:
+                        skipped_count += remaining
+                    break
+
+                if first_message_prefix and date_prefix < first_message_prefix:
+                    skipped_by_message_date += 1
+                    if debug_enabled:
+                        debug(
+                            "Skipped transaction dated %s (before first message date %s)", date_prefix, first_message_prefix)
+                    continue
+
+                if (date_prefix < start_prefix and date_prefix != first_message_prefix) or date_prefix > end_prefix:
+                    skipped_count += 1
+                    if debug_enabled:
+                        debug(
+                            "Skipped transaction dated %s (outside %d days range)", date_prefix, days_back)
+                    continue
+
             try:
-                # ISO format parse et (2025-09-25T13:15:14)
-                if 'T' in transaction_date_str:
-                    transaction_date = datetime.fromisoformat(
-                        transaction_date_str.replace('T', ' '))
-                else:
-                    transaction_date = datetime.strptime(
-                        transaction_date_str, '%Y-%m-%d %H:%M:%S')
+                # ISO format parse et (2025-09-25T13:15:14 veya 2025-09-25 13:15:14)
+                transaction_date = datetime.fromisoformat(transaction_date_str)
 
                 # İlk mesaj tarihinden önce ise atla
                 if first_message_date and transaction_date < first_message_date:
                     skipped_by_message_date += 1
-                    self.logger.debug(
-                        f"Skipped transaction dated {transaction_date.strftime('%Y-%m-%d')} (before first message date {first_message_date.strftime('%Y-%m-%d')})")
+                    if debug_enabled:
+                        debug(
+                            "Skipped transaction dated %s (before first message date %s)", transaction_date.date(), first_message_prefix)
                     continue
 
                 # Son n gün içinde mi kontrol et
                 if start_date <= transaction_date <= end_date:
-                    filtered_transactions.append(transaction)
+                    append(transaction)
                 else:
                     skipped_count += 1
-                    self.logger.debug(
-                        f"Skipped transaction dated {transaction_date.strftime('%Y-%m-%d')} (outside {days_back} days range)")
+                    if debug_enabled:
+                        debug(
+                            "Skipped transaction dated %s (outside %d days range)", transaction_date.date(), days_back)
 
             except Exception as e:
                 skipped_count += 1
-                self.logger.warning(
-                    f"Error parsing transaction date '{transaction_date_str}': {e}")
+                warning(
+                    "Error parsing transaction date '%s': %s", transaction_date_str, e)
 
         if skipped_count > 0 or skipped_by_message_date > 0:
-            self.logger.info(
-                f"Filtered transactions: {len(filtered_transactions)} kept, {skipped_count} skipped (outside date range), {skipped_by_message_date} skipped (before first message)")
+            debug(
+                "Filtered transactions: %d kept, %d skipped (outside date range), %d skipped (before first message)",
+                len(filtered_transactions), skipped_count, skipped_by_message_date)
 
         return filtered_transactions
 
     def get_patient_details(self, app_id: str, phone_number: str, country_code: str = "TR") -> Optional[PatientDetailResponse]:
+        cache_key = (app_id, country_code, phone_number)
+        cached = self._patient_details_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             payload = {
                 "appId": app_id,
@@ -177,25 +303,32 @@ class HIYSAPIService:
             self.logger.debug(
                 f"Getting patient details for phone: {phone_number}, appId: {app_id}")
 
-            result = self._make_request(
+            content = self._make_request(
                 self.patient_detail_url,
                 payload,
                 f"Patient Details (phone: {phone_number})"
             )
 
-            if result is None:
+            if content is None:
                 return None
 
-            # Hata yanıtı kontrolü
-            if 'error' in result and result.get('error') is True:
-                error_message = result.get('message', 'Unknown error')
-                self.logger.info(
-                    f"Patient not found for phone {phone_number}: {error_message}")
-                return None
+            # Hata yanıtı kontrolü (sadece gövdede "error" geçiyorsa parse edilir)
+            if b'"error"' in content:
+                result = json.loads(content)
+                if isinstance(result, dict) and result.get('error') is True:
+                    error_message = result.get('message', 'Unknown error')
+                    self.logger.debug(
+                        f"Patient not found for phone {phone_number}: {error_message}")
+                    return None
 
             # Başarılı yanıt kontrolü
-            if result and 'patients' in result and result['patients']:
-                return PatientDetailResponse(**result)
+            patient_details = None
+            if b'"patients"' in content:
+                patient_details = PatientDetailResponse.model_validate_json(content)
+
+            if patient_details and patient_details.patients:
+                self._patient_details_cache.set(cache_key, patient_details)
+                return patient_details
             else:
                 self.logger.warning(
                     f"No patients found for phone: {phone_number}")
@@ -207,6 +340,11 @@ class HIYSAPIService:
             return None
 
     def get_patient_transactions(self, app_id: str, upn: str) -> Optional[TransactionResponse]:
+        cache_key = (app_id, upn)
+        cached = self._transactions_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             payload = {
                 "appId": int(app_id),
@@ -216,14 +354,16 @@ class HIYSAPIService:
             self.logger.debug(
                 f"Getting transactions for UPN: {upn}, appId: {app_id}")
 
-            result = self._make_request(
+            content = self._make_request(
                 self.transactions_url,
                 payload,
                 f"Transactions (UPN: {upn})"
             )
 
-            if result and 'transactions' in result:
-                return TransactionResponse(**result)
+            if content and b'"transactions"' in content:
+                transactions = TransactionResponse.model_validate_json(content)
+                self._transactions_cache.set(cache_key, transactions)
+                return transactions
             else:
                 self.logger.warning(f"No transactions found for UPN: {upn}")
                 return None
@@ -233,8 +373,33 @@ class HIYSAPIService:
                 f"Error parsing transactions response for UPN {upn}: {e}")
             return None
 
-    def enrich_patient_data(self, patient_data: PatientData, app_id: str) -> Optional[EnrichedPatientData]:
-
+    def _map_concurrently(self, func, items: List[Any]) -> List[Any]:
+        if not items:
+            return []
+        return list(self._executor.map(func, items))
+
+    def get_patient_details_bulk(self, app_id: str, phone_numbers: List[str], country_code: str = "TR") -> Dict[str, PatientDetailResponse]:
+        # HIYS tek telefon kabul eder: tekrarlar ayıklanıp istekler pooled session üzerinden paralel gönderilir
+        unique_phones = list(dict.fromkeys(phone_numbers))
+        responses = self._map_concurrently(
+            lambda phone: self.get_patient_details(app_id, phone, country_code), unique_phones)
+        return {
+            phone: response
+            for phone, response in zip(unique_phones, responses)
+            if response is not None
+        }
+
+    def get_patient_transactions_bulk(self, app_id: str, upns: List[str]) -> Dict[str, TransactionResponse]:
+        unique_upns = list(dict.fromkeys(upns))
+        responses = self._map_concurrently(
+            lambda upn: self.get_patient_transactions(app_id, upn), unique_upns)
+        return {
+            upn: response
+            for upn, response in zip(unique_upns, responses)
+            if response is not None
+        }
+
+    def _resolve_first_message_date(self, patient_data: PatientData) -> Optional[datetime]:
         # Chatlist'ten ilk mesaj tarihini al (eğer database service mevcut ise)
         first_message_date = None
         if self.database_service:
@@ -248,11 +413,53 @@ class HIYSAPIService:
                 self.logger.warning(f"Error getting first message date for patient {patient_data.userPatientId}: {e}")
         else:
             self.logger.warning(f"Patient {patient_data.userPatientId}: Database service not available for first message date")
+        return first_message_date
+
+    def _resolve_first_message_dates(self, patients: List[PatientData]) -> Dict[int, datetime]:
+        # Batch'in tamamı için tek sorgu (hasta başına DB round-trip yerine)
+        if not self.database_service:
+            self.logger.warning("Database service not available for first message dates")
+            return {}
+
+        try:
+            return self.database_service.get_first_message_dates_for_patients(
+                [patient.userPatientId for patient in patients])
+        except Exception as e:
+            self.logger.warning(f"Error getting first message dates for batch: {e}")
+            return {}
+
+    def _has_transaction_window(self, first_message_date: Optional[datetime], now: datetime) -> bool:
+        # İşlemler [max(başlangıç, ilk mesaj), şimdi] aralığında tutulur. İlk mesaj
+        # tarihi eski olsa da aralık açıktır; sadece gelecekteyse aralık boştur
+        # ve HIYS çağrılarına gerek kalmaz. İlk mesaj tarihi yoksa filtre yalnızca
+        # gün aralığına göre çalışır.
+        return first_message_date is None or first_message_date <= now
+
+    def enrich_patient_data(self, patient_data: PatientData, app_id: str, first_message_date: Any = _UNRESOLVED) -> Optional[EnrichedPatientData]:
+        if first_message_date is _UNRESOLVED:
+            first_message_date = self._resolve_first_message_date(patient_data)
+
+        if not self._has_transaction_window(first_message_date, datetime.now()):
+            self.logger.debug(
+                f"Patient {patient_data.userPatientId}: First message date {first_message_date} is in the future - skipping")
+            return None
 
         # 1. Hasta detaylarını getir
         patient_details_response = self.get_patient_details(
             app_id, patient_data.phoneNumber)
+        patient_detail = self._select_patient_detail(
+            patient_data, patient_details_response)
+        if patient_detail is None:
+            return None
 
+        # 2. UPN ile işlemleri getir
+        transactions_response = self.get_patient_transactions(
+            app_id, patient_detail.UPN)
+
+        return self._build_enriched_patient(
+            patient_data, patient_detail, transactions_response, first_message_date)
+
+    def _select_patient_detail(self, patient_data: PatientData, patient_details_response: Optional[PatientDetailResponse]) -> Optional[PatientDetail]:
         # İlk API başarısız ise None döndür (bu hasta işlenmeyecek)
         if not patient_details_response or not patient_details_response.patients:
             self.logger.debug(
@@ -260,16 +467,16 @@ class HIYSAPIService:
             return None
 
         # İlk hastayı al (telefon numarası unique olmalı)
-        patient_detail = patient_details_response.patients[0]
+        return patient_details_response.patients[0]
 
-        # 2. UPN ile işlemleri getir
-        transactions_response = self.get_patient_transactions(
-            app_id, patient_detail.UPN)
+    def _build_enriched_patient(self, patient_data: PatientData, patient_detail: PatientDetail, transactions_response: Optional[TransactionResponse], first_message_date: Optional[datetime]) -> Optional[EnrichedPatientData]:
+        logger = self.logger
+        upid = patient_data.userPatientId
 
         # İkinci API de başarısız ise None döndür (bu hasta işlenmeyecek)
         if not transactions_response or not transactions_response.transactions:
-            self.logger.debug(
-                f"Patient {patient_data.userPatientId}: No transactions found in HIYS - skipping")
+            logger.debug(
+                f"Patient {upid}: No transactions found in HIYS - skipping")
             return None
 
         # Transaction'ları ilk mesaj tarihi ve gün filtresi ile filtrele
@@ -278,36 +485,35 @@ class HIYSAPIService:
 
         # Filtreleme sonrası transaction kalmadıysa hasta eklenmez
         if not recent_transactions:
-            self.logger.debug(
-                f"Patient {patient_data.userPatientId}: No recent transactions (within {RECENT_TRANSACTIONS_DAYS} days and after first message) - skipping")
+            logger.debug(
+                f"Patient {upid}: No recent transactions (within {RECENT_TRANSACTIONS_DAYS} days and after first message) - skipping")
             return None
 
-        # Her iki API de başarılı - enriched patient oluştur
-        enriched_patient = EnrichedPatientData(
-            userPatientId=patient_data.userPatientId,
+        transaction_count = len(recent_transactions)
+
+        # Her iki API de başarılı - enriched patient oluştur. Alanların hepsi
+        # zaten doğrulanmış modellerden geldiği için tekrar validasyon yapılmaz.
+        enriched_patient = EnrichedPatientData.model_construct(
+            userPatientId=upid,
             chatType=patient_data.chatType,
             language=patient_data.language,
             phoneNumber=patient_data.phoneNumber,
+            patientDetails=patient_detail,
+            # Filtrelenmiş transactions (sadece ilk mesaj tarihi sonrası ve son n günlük)
+            transactions=recent_transactions,
+            transactionCount=transaction_count,
+            patientFound=True,
+            transactionsFound=True,
             ilkMesajTarihi=first_message_date
         )
-        
-        self.logger.debug(f"Patient {patient_data.userPatientId}: EnrichedPatientData created with ilkMesajTarihi: {first_message_date}")
 
-        # Patient details ekle
-        enriched_patient.patientDetails = patient_detail
-        enriched_patient.patientFound = True
+        if logger.isEnabledFor(logging.DEBUG):
+            log_message = f"Enriched patient {upid}: {transaction_count} recent transactions found"
+            if first_message_date:
+                log_message += f" (after first message date: {first_message_date.strftime('%Y-%m-%d')})"
+            log_message += f" (within {RECENT_TRANSACTIONS_DAYS} days)"
 
-        # Filtrelenmiş transactions ekle (sadece son mesaj tarihi sonrası ve son n günlük)
-        enriched_patient.transactions = recent_transactions
-        enriched_patient.transactionCount = len(recent_transactions)
-        enriched_patient.transactionsFound = True
-
-        log_message = f"Enriched patient {patient_data.userPatientId}: {len(recent_transactions)} recent transactions found"
-        if first_message_date:
-            log_message += f" (after first message date: {first_message_date.strftime('%Y-%m-%d')})"
-        log_message += f" (within {RECENT_TRANSACTIONS_DAYS} days)"
-        
-        self.logger.info(log_message)
+            logger.debug(log_message)
 
         return enriched_patient
 
@@ -327,31 +533,69 @@ class HIYSAPIService:
             batch_num = (i // batch_size) + 1
             total_batches = (total_patients + batch_size - 1) // batch_size
 
-            self.logger.info(
+            self.logger.debug(
                 f"Processing batch {batch_num}/{total_batches} ({len(batch)} patients)")
 
-            for patient in batch:
+            batch_enriched = 0
+            batch_skipped = 0
+            batch_transactions = 0
+
+            first_message_dates_by_id = self._resolve_first_message_dates(batch)
+            first_message_dates = [
+                first_message_dates_by_id.get(patient.userPatientId) for patient in batch]
+
+            # Tarih aralığı boş kalan hastalar için HIYS'e hiç gidilmez
+            now = datetime.now()
+            eligible = [
+                self._has_transaction_window(first_message_date, now)
+                for first_message_date in first_message_dates]
+
+            # 1. Batch'teki tüm hasta detayları, 2. bulunan UPN'lerin işlemleri toplu alınır
+            details_by_phone = self.get_patient_details_bulk(
+                app_id, [patient.phoneNumber for patient, ok in zip(batch, eligible) if ok])
+            patient_details = [
+                self._select_patient_detail(patient, details_by_phone.get(patient.phoneNumber)) if ok else None
+                for patient, ok in zip(batch, eligible)
+            ]
+            transactions_by_upn = self.get_patient_transactions_bulk(
+                app_id, [detail.UPN for detail in patient_details if detail is not None])
+
+            for patient, patient_detail, first_message_date in zip(batch, patient_details, first_message_dates):
+                if patient_detail is None:
+                    batch_skipped += 1
+                    continue
+
                 try:
-                    enriched_patient = self.enrich_patient_data(
-                        patient, app_id)
+                    enriched_patient = self._build_enriched_patient(
+                        patient, patient_detail, transactions_by_upn.get(patient_detail.UPN), first_message_date)
 
                     # Sadece başarılı olanları ekle (None dönenler atlanır)
                     if enriched_patient is not None:
                         enriched_patients.append(enriched_patient)
+                        batch_enriched += 1
+                        batch_transactions += enriched_patient.transactionCount
                     else:
-                        skipped_count += 1
+                        batch_skipped += 1
 
                 except Exception as e:
                     self.logger.error(
                         f"Error enriching patient {patient.userPatientId}: {e}")
-                    skipped_count += 1
+                    batch_skipped += 1
+
+            skipped_count += batch_skipped
+            # Hasta başına satır yerine batch başına tek özet
+            self.logger.info(
+                "Batch %d/%d: enriched=%d skipped=%d avg_tx=%.1f",
+                batch_num, total_batches, batch_enriched, batch_skipped,
+                batch_transactions / batch_enriched if batch_enriched else 0.0)
 
             # Batch'ler arası bekleme
             if i + batch_size < total_patients:
-                batch_delay = self.request_delay * 5
-                self.logger.info(
-                    f"Batch {batch_num} completed. Waiting {batch_delay}s before next batch...")
-                time.sleep(batch_delay)
+                batch_delay = self._next_batch_delay()
+                if batch_delay > 0:
+                    self.logger.debug(
+                        f"Batch {batch_num} completed. Waiting {batch_delay:.2f}s before next batch...")
+                    time.sleep(batch_delay)
 
         success_count = len(enriched_patients)
         self.logger.info(
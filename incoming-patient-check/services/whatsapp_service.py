@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 from typing import Dict, Any
 from datetime import datetime
@@ -12,6 +14,7 @@ from config.constants import (
 
 # SSL uyarılarını bastır
 import urllib3
+from urllib3.util.retry import Retry
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
@@ -23,16 +26,38 @@ class WhatsAppService:
         self.enabled = ENABLE_WHATSAPP_NOTIFICATIONS
         self.timeout = WHATSAPP_REQUEST_TIMEOUT
         self.verify_ssl = WHATSAPP_VERIFY_SSL
+
+        # Tüm bildirimler aynı host'a gider: keep-alive bağlantı tekrar kullanılır
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        atexit.register(self.close)
+
+    def __enter__(self):
+        """Context manager support"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager cleanup"""
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
     
     def send_message(self, message: str) -> bool:
         if not self.enabled or not message:
             return True
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 json={"to": self.phone_number, "message": message},
-                headers={'Content-Type': 'application/json'},
                 timeout=self.timeout,
                 verify=self.verify_ssl
             )
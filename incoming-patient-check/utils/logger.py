@@ -1,21 +1,27 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
 from typing import Optional, Union
 
+# Dosya/konsol yazımını arka planda yapan listener (setup_logging tarafından başlatılır)
+_listener: Optional[logging.handlers.QueueListener] = None
+# Süreç başına tek yapılandırma: tekrar çağrılar handler/fd sızdırmaz, loglar çoğalmaz
+_CONFIGURED = False
+
+LOG_BACKUP_DAYS = 30
+
+
+def setup_logging(log_level: str = "INFO", log_file: str = "logs/cron_service.log", dated: bool = True) -> None:
+    global _listener, _CONFIGURED
+
+    if _CONFIGURED:
+        return
 
-def setup_logging(log_level: str = "INFO", log_file: str = "logs/cron_service.log") -> None:
-    # Dosya adına tarih ekle
     log_dir = os.path.dirname(log_file)
-    log_filename = os.path.basename(log_file)
-    name, ext = os.path.splitext(log_filename)
-    
-    # Günlük log dosyası adı: cron_service_2026-02-17.log
-    dated_filename = f"{name}_{datetime.now().strftime('%Y-%m-%d')}{ext}"
-    dated_log_file = os.path.join(log_dir, dated_filename)
-    
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
@@ -32,24 +38,37 @@ def setup_logging(log_level: str = "INFO", log_file: str = "logs/cron_service.lo
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
 
-    file_handler = logging.FileHandler(dated_log_file, encoding='utf-8')
+    if dated:
+        # Günlük dosya: gece yarısından sonraki ilk yazımda cron_service.log.2026-02-17 olarak döndürülür
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when='midnight', backupCount=LOG_BACKUP_DAYS, encoding='utf-8')
+    else:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
     file_handler.setLevel(numeric_level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    logger.info(f"Logging configured - Level: {log_level}, File: {dated_log_file}")
+    # Sıcak döngüler sadece kuyruğa yazar; disk/konsol I/O'su listener thread'inde yapılır
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    # Çıkışta kuyrukta kalan kayıtlar boşaltılır
+    atexit.register(_listener.stop)
+
+    _CONFIGURED = True
+    logger.info(f"Logging configured - Level: {log_level}, File: {log_file}")
 
 
 def log_execution_start() -> None:
     logger = logging.getLogger(__name__)
     logger.info("=" * 50)
     logger.info("CRON JOB EXECUTION STARTED")
-    logger.info(f"Execution Time: {datetime.now()}")
     logger.info("=" * 50)
 
 
@@ -59,5 +78,4 @@ def log_execution_end(success: bool, duration: float = 0):
     status = "COMPLETED SUCCESSFULLY" if success else "COMPLETED WITH ERRORS"
     logger.info(f"CRON JOB EXECUTION {status}")
     logger.info(f"Duration: {duration:.2f} seconds")
-    logger.info(f"End Time: {datetime.now()}")
     logger.info("=" * 50)
@@ -5,6 +5,9 @@ import os
 import logging
 import argparse
 import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
@@ -22,8 +25,7 @@ else:
             sys.path.insert(0, install_dir)
             break
 
-from backup_cleaner import BackupCleaner
-from mysql_backup import MySQLBackup
+# MySQLBackup ve BackupCleaner kullanıldıkları yerde import edilir
 from env_parser import EnvParser
 
 
@@ -33,11 +35,37 @@ class MySQLBackupService:
         self.logger = self._setup_logging()
 
         self.env_parser = EnvParser(self.config['env_directory'])
-        self.backup_service = MySQLBackup(self.config['backup_directory'])
-        self.cleaner = BackupCleaner(
-            self.config['backup_directory'],
-            self.config['retention_days']
-        )
+        self._backup_service = None
+        self._cleaner = None
+
+        # Aynı MySQL sunucusuna aynı anda en fazla max_jobs_per_host dump
+        max_jobs_per_host = max(1, int(self.config['max_jobs_per_host']))
+        self._host_semaphores = defaultdict(
+            lambda: threading.Semaphore(max_jobs_per_host))
+        self._host_semaphores_lock = threading.Lock()
+
+    @property
+    def backup_service(self):
+        if self._backup_service is None:
+            from mysql_backup import MySQLBackup
+            self._backup_service = MySQLBackup(
+                self.config['backup_directory'],
+                dump_tool=self.config['dump_tool'],
+                mydumper_threads=self.config['mydumper_threads'],
+                compression=self.config['compression'],
+                compress_protocol=self.config['compress_protocol']
+            )
+        return self._backup_service
+
+    @property
+    def cleaner(self):
+        if self._cleaner is None:
+            from backup_cleaner import BackupCleaner
+            self._cleaner = BackupCleaner(
+                self.config['backup_directory'],
+                self.config['retention_days']
+            )
+        return self._cleaner
 
     def _load_config(self, config_file: str) -> Dict[str, Any]:
         default_config = {
@@ -46,6 +74,12 @@ class MySQLBackupService:
             'log_directory': '/var/log/mysql-backup',
             'log_level': 'INFO',
             'retention_days': 3,
+            'parallel_jobs': None,
+            'max_jobs_per_host': 2,
+            'dump_tool': 'mysqldump',
+            'mydumper_threads': 4,
+            'compression': 'gzip',
+            'compress_protocol': True,
             'notification': {
                 'enabled': False,
                 'email': None,
@@ -100,18 +134,34 @@ class MySQLBackupService:
             if not db_configs:
                 return results
 
-            for db_config in db_configs:
-                backup_result = self._backup_single_database(db_config)
-                results['backup_details'].append(backup_result)
+            # Worker thread'ler başlamadan önce oluşturulur (lazy property yarışı olmasın)
+            self.backup_service
 
-                if backup_result['success']:
-                    results['successful_backups'] += 1
-                else:
-                    results['failed_backups'] += 1
-                    results['errors'].append(backup_result['error'])
+            # mysqldump süreçleri GIL dışında çalışır; thread'ler yeterli
+            parallel_jobs = self.config.get('parallel_jobs') or min(8, len(db_configs))
+            with ThreadPoolExecutor(max_workers=max(1, int(parallel_jobs))) as executor:
+                futures = [
+                    executor.submit(self._backup_single_database, db_config)
+                    for db_config in db_configs
+                ]
+
+                for future in as_completed(futures):
+                    backup_result = future.result()
+                    results['backup_details'].append(backup_result)
 
-            cleanup_stats = self.cleaner.cleanup_old_backups()
+                    if backup_result['success']:
+                        results['successful_backups'] += 1
+                    else:
+                        results['failed_backups'] += 1
+                        results['errors'].append(backup_result['error'])
+
+            cleanup_stats, backup_summary = self.cleaner.cleanup_and_summarize()
             results['cleanup_stats'] = cleanup_stats
+            # Yedek çıktısında dosya listesi yer almaz, sadece toplamlar
+            results['backup_summary'] = {
+                key: value for key, value in backup_summary.items()
+                if key != 'backup_files'
+            }
 
         except Exception as e:
             self.logger.error(f"Error during backup operation: {str(e)}")
@@ -138,7 +188,11 @@ class MySQLBackupService:
         }
 
         try:
-            backup_path = self.backup_service.create_backup(db_config)
+            with self._host_semaphores_lock:
+                host_semaphore = self._host_semaphores[db_config['host']]
+
+            with host_semaphore:
+                backup_path = self.backup_service.create_backup(db_config)
 
             if backup_path:
                 backup_info = self.backup_service.get_backup_info(backup_path)
@@ -180,8 +234,13 @@ class MySQLBackupService:
                 for config in db_configs
             ]
 
-            status['backup_summary'] = self.cleaner.get_backup_summary()
-            status['retention_verification'] = self.cleaner.verify_retention_policy()
+            backup_summary = self.cleaner.get_backup_summary()
+            status['retention_verification'] = self.cleaner.verify_retention_policy(
+                summary=backup_summary)
+            # Durum çıktısında sadece en yeni yedekler listelenir
+            status['backup_summary'] = dict(
+                backup_summary,
+                backup_files=self.cleaner.describe_backup_files(backup_summary))
 
         except Exception as e:
             status['error'] = str(e)
@@ -2,10 +2,16 @@
 
 import os
 import logging
-import glob
+import shutil
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+SUMMARY_CACHE_TTL = 1.0  # saniye
+BACKUP_FILE_SUFFIXES = ('.sql', '.sql.gz')
+BACKUP_DIR_SUFFIX = '.sql.d'
+RECENT_BACKUP_FILES_LIMIT = 20
 
 
 class BackupCleaner:
@@ -13,51 +19,93 @@ class BackupCleaner:
         self.backup_directory = Path(backup_directory)
         self.retention_days = retention_days
         self.logger = logging.getLogger(__name__)
+        # (özet, monotonic zaman): aynı istek içindeki tekrar taramaları önler
+        self._summary_cache = (None, 0.0)
 
     def cleanup_old_backups(self) -> Dict[str, Any]:
-        stats = {
-            'total_files_checked': 0,
-            'files_removed': 0,
-            'space_freed': 0,
-            'errors': 0,
-            'removed_files': [],
-            'error_files': []
-        }
+        stats = self._new_cleanup_stats()
 
         if not self.backup_directory.exists():
             return stats
 
-        cutoff_date = datetime.now() - timedelta(days=self.retention_days)
-        backup_pattern = str(self.backup_directory / "*.sql")
-        backup_files = glob.glob(backup_pattern)
-        stats['total_files_checked'] = len(backup_files)
-
-        for backup_file in backup_files:
-            try:
-                file_path = Path(backup_file)
-                file_ctime = datetime.fromtimestamp(file_path.stat().st_ctime)
-
-                if file_ctime < cutoff_date:
-                    file_size = file_path.stat().st_size
-                    file_path.unlink()
-                    stats['files_removed'] += 1
-                    stats['space_freed'] += file_size
-                    stats['removed_files'].append({
-                        'filename': file_path.name,
-                        'size': file_size,
-                        'created': file_ctime
-                    })
-            except Exception as e:
-                stats['errors'] += 1
-                stats['error_files'].append({
-                    'filename': backup_file,
-                    'error': str(e)
-                })
+        self._summary_cache = (None, 0.0)
+        cutoff_ts = self._cutoff_timestamp()
+        dir_fd = self._open_directory_fd()
+
+        try:
+            for entry, stat in self._iter_backups():
+                stats['total_files_checked'] += 1
+                self._remove_if_expired(entry, stat, cutoff_ts, stats, dir_fd)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
 
         return stats
 
     def get_backup_summary(self) -> Dict[str, Any]:
-        summary = {
+        cached_summary, cached_at = self._summary_cache
+        if cached_summary is not None and time.monotonic() - cached_at < SUMMARY_CACHE_TTL:
+            return cached_summary
+
+        summary = self._new_summary()
+
+        if self.backup_directory.exists():
+            age_thresholds = self._age_thresholds()
+            for entry, stat in self._iter_backups():
+                self._add_to_summary(summary, entry, stat, age_thresholds)
+            self._finalize_summary(summary)
+
+        self._summary_cache = (summary, time.monotonic())
+        return summary
+
+    def cleanup_and_summarize(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # Tek dizin taraması: süresi dolanlar silinir, kalanlar özete eklenir
+        stats = self._new_cleanup_stats()
+        summary = self._new_summary()
+
+        if not self.backup_directory.exists():
+            return stats, summary
+
+        cutoff_ts = self._cutoff_timestamp()
+        age_thresholds = self._age_thresholds()
+        dir_fd = self._open_directory_fd()
+
+        try:
+            for entry, stat in self._iter_backups():
+                stats['total_files_checked'] += 1
+                if not self._remove_if_expired(entry, stat, cutoff_ts, stats, dir_fd):
+                    self._add_to_summary(summary, entry, stat, age_thresholds)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+
+        self._finalize_summary(summary)
+        self._summary_cache = (summary, time.monotonic())
+        return stats, summary
+
+    def describe_backup_files(self, summary: Dict[str, Any], limit: int = RECENT_BACKUP_FILES_LIMIT) -> List[Dict[str, Any]]:
+        # Sadece en yeni `limit` yedek için dict oluşturulur; toplamlar zaten özette
+        return [
+            {
+                'filename': filename,
+                'size': size,
+                'created': datetime.fromtimestamp(ctime)
+            }
+            for ctime, size, filename in summary['backup_files'][:limit]
+        ]
+
+    def _new_cleanup_stats(self) -> Dict[str, Any]:
+        return {
+            'total_files_checked': 0,
+            'files_removed': 0,
+            'space_freed': 0,
+            'errors': 0,
+            'removed_files': [],
+            'error_files': []
+        }
+
+    def _new_summary(self) -> Dict[str, Any]:
+        return {
             'total_backups': 0,
             'total_size': 0,
             'oldest_backup': None,
@@ -71,59 +119,98 @@ class BackupCleaner:
             'backup_files': []
         }
 
-        if not self.backup_directory.exists():
-            return summary
+    def _cutoff_timestamp(self) -> float:
+        return (datetime.now() - timedelta(days=self.retention_days)).timestamp()
 
-        backup_pattern = str(self.backup_directory / "*.sql")
-        backup_files = glob.glob(backup_pattern)
+    def _age_thresholds(self) -> Tuple[float, float, float]:
+        # Yaş sınıflandırması ham epoch değerleriyle yapılır; datetime sadece
+        # dışarı verilen alanlar için oluşturulur
+        now = datetime.now()
+        today_start_ts = datetime.combine(now.date(), datetime.min.time()).timestamp()
+        yesterday_start_ts = datetime.combine(
+            (now - timedelta(days=1)).date(), datetime.min.time()).timestamp()
+        week_ago_ts = (now - timedelta(days=7)).timestamp()
+        return today_start_ts, yesterday_start_ts, week_ago_ts
 
-        if not backup_files:
-            return summary
+    def _open_directory_fd(self) -> Optional[int]:
+        # Silmeler dizin fd'sine göre yapılır (unlinkat): her dosya için tam yol
+        # çözümlenmez. Desteklenmeyen platformlarda tam yol kullanılır.
+        if os.unlink not in os.supports_dir_fd:
+            return None
+        try:
+            return os.open(self.backup_directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        except OSError:
+            return None
 
-        now = datetime.now()
-        today = now.date()
-        yesterday = (now - timedelta(days=1)).date()
-        week_ago = now - timedelta(days=7)
-
-        for backup_file in backup_files:
-            try:
-                file_path = Path(backup_file)
-                stat = file_path.stat()
-
-                file_info = {
-                    'filename': file_path.name,
-                    'size': stat.st_size,
-                    'created': datetime.fromtimestamp(stat.st_ctime),
-                    'modified': datetime.fromtimestamp(stat.st_mtime)
-                }
-
-                summary['backup_files'].append(file_info)
-                summary['total_size'] += stat.st_size
-
-                if summary['oldest_backup'] is None or file_info['created'] < summary['oldest_backup']:
-                    summary['oldest_backup'] = file_info['created']
-
-                if summary['newest_backup'] is None or file_info['created'] > summary['newest_backup']:
-                    summary['newest_backup'] = file_info['created']
-
-                file_date = file_info['created'].date()
-                if file_date == today:
-                    summary['backups_by_age']['today'] += 1
-                elif file_date == yesterday:
-                    summary['backups_by_age']['yesterday'] += 1
-                elif file_info['created'] >= week_ago:
-                    summary['backups_by_age']['this_week'] += 1
+    def _remove_if_expired(self, entry: os.DirEntry, stat: os.stat_result, cutoff_ts: float, stats: Dict[str, Any], dir_fd: Optional[int] = None) -> bool:
+        if stat.st_ctime >= cutoff_ts:
+            return False
+
+        try:
+            if entry.is_dir():
+                file_size = self._directory_size(entry.path)
+                shutil.rmtree(entry.path)
+            else:
+                file_size = stat.st_size
+                if dir_fd is not None:
+                    os.unlink(entry.name, dir_fd=dir_fd)
                 else:
-                    summary['backups_by_age']['older'] += 1
+                    os.unlink(entry.path)
+        except Exception as e:
+            stats['errors'] += 1
+            stats['error_files'].append({
+                'filename': entry.path,
+                'error': str(e)
+            })
+            return False
+
+        stats['files_removed'] += 1
+        stats['space_freed'] += file_size
+        stats['removed_files'].append({
+            'filename': entry.name,
+            'size': file_size,
+            'created': datetime.fromtimestamp(stat.st_ctime)
+        })
+        return True
+
+    def _add_to_summary(self, summary: Dict[str, Any], entry: os.DirEntry, stat: os.stat_result, age_thresholds: Tuple[float, float, float]) -> None:
+        today_start_ts, yesterday_start_ts, week_ago_ts = age_thresholds
+        try:
+            size = self._directory_size(entry.path) if entry.is_dir() else stat.st_size
+        except OSError:
+            return
+        ctime = stat.st_ctime
+
+        # Dosya başına dict/datetime yerine (ctime, boyut, ad) tuple'ı tutulur;
+        # dict'ler sadece ihtiyaç olduğunda describe_backup_files ile oluşturulur
+        summary['backup_files'].append((ctime, size, entry.name))
+        summary['total_size'] += size
+
+        # Sonlandırılana kadar en eski/en yeni değerler epoch olarak tutulur
+        if summary['oldest_backup'] is None or ctime < summary['oldest_backup']:
+            summary['oldest_backup'] = ctime
 
-            except Exception:
-                continue
+        if summary['newest_backup'] is None or ctime > summary['newest_backup']:
+            summary['newest_backup'] = ctime
 
+        backups_by_age = summary['backups_by_age']
+        if ctime >= today_start_ts:
+            backups_by_age['today'] += 1
+        elif ctime >= yesterday_start_ts:
+            backups_by_age['yesterday'] += 1
+        elif ctime >= week_ago_ts:
+            backups_by_age['this_week'] += 1
+        else:
+            backups_by_age['older'] += 1
+
+    def _finalize_summary(self, summary: Dict[str, Any]) -> None:
         summary['total_backups'] = len(summary['backup_files'])
-        summary['backup_files'].sort(key=lambda x: x['created'], reverse=True)
-        return summary
+        summary['backup_files'].sort(reverse=True)
+        if summary['oldest_backup'] is not None:
+            summary['oldest_backup'] = datetime.fromtimestamp(summary['oldest_backup'])
+            summary['newest_backup'] = datetime.fromtimestamp(summary['newest_backup'])
 
-    def verify_retention_policy(self) -> Dict[str, Any]:
+    def verify_retention_policy(self, summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         verification = {
             'policy_compliant': True,
             'retention_days': self.retention_days,
@@ -131,21 +218,24 @@ class BackupCleaner:
             'recommendations': []
         }
 
-        summary = self.get_backup_summary()
+        if summary is None:
+            summary = self.get_backup_summary()
 
         if summary['total_backups'] == 0:
             verification['recommendations'].append("No backup files found")
             return verification
 
-        cutoff_date = datetime.now() - timedelta(days=self.retention_days)
+        now = datetime.now()
+        cutoff_ts = self._cutoff_timestamp()
 
-        for backup in summary['backup_files']:
-            if backup['created'] < cutoff_date:
+        for ctime, _, filename in summary['backup_files']:
+            if ctime < cutoff_ts:
+                created = datetime.fromtimestamp(ctime)
                 verification['policy_compliant'] = False
                 verification['violations'].append({
-                    'filename': backup['filename'],
-                    'age_days': (datetime.now() - backup['created']).days,
-                    'created': backup['created']
+                    'filename': filename,
+                    'age_days': (now - created).days,
+                    'created': created
                 })
 
         if verification['violations']:
@@ -160,6 +250,34 @@ class BackupCleaner:
 
         return verification
 
+    def _iter_backups(self) -> Iterator[Tuple[os.DirEntry, os.stat_result]]:
+        # Sadece yedek biçimleri: .sql / .sql.gz dosyaları ve mydumper'ın .sql.d
+        # dizinleri (gizli dosyalar hariç). Her girdi için tek stat; dosya
+        # başına Path nesnesi oluşmaz.
+        with os.scandir(self.backup_directory) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                try:
+                    if name.endswith(BACKUP_FILE_SUFFIXES):
+                        if not entry.is_file():
+                            continue
+                    elif name.endswith(BACKUP_DIR_SUFFIX):
+                        if not entry.is_dir():
+                            continue
+                    else:
+                        continue
+                    stat = entry.stat()
+                except OSError as e:
+                    self.logger.warning(f"Could not stat {entry.path}: {e}")
+                    continue
+                yield entry, stat
+
+    def _directory_size(self, directory: str) -> int:
+        with os.scandir(directory) as it:
+            return sum(entry.stat().st_size for entry in it if entry.is_file())
+
     def _format_bytes(self, bytes_size: int) -> str:
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
             if bytes_size < 1024.0:
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
 import os
-import glob
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from pathlib import Path
 
@@ -15,19 +15,22 @@ class EnvParser:
     def parse_env_file(self, file_path: str) -> Dict[str, str]:
         env_vars = {}
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                for line_number, line in enumerate(file, 1):
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"').strip("'")
-                        env_vars[key] = value
-                    else:
-                        self.logger.warning(
-                            f"Invalid line in {file_path}:{line_number}: {line}")
+            # Dosya tek seferde okunur; partition ara liste oluşturmaz
+            text = Path(file_path).read_text(encoding='utf-8', errors='replace')
+            for line_number, raw_line in enumerate(text.splitlines(), 1):
+                line = raw_line.strip()
+                if not line or line[0] == '#':
+                    continue
+                key, sep, value = line.partition('=')
+                if not sep:
+                    self.logger.warning(
+                        f"Invalid line in {file_path}:{line_number}: {line}")
+                    continue
+                # Değer aynı tırnakla başlayıp bitiyorsa tek dilimle soyulur
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+                    value = value[1:-1]
+                env_vars[key.strip()] = value
         except Exception as e:
             self.logger.error(f"Error reading {file_path}: {str(e)}")
         return env_vars
@@ -39,13 +42,22 @@ class EnvParser:
                 f"Environment directory does not exist: {self.env_directory}")
             return db_configs
 
-        env_files = glob.glob(str(self.env_directory / "*.env"))
+        with os.scandir(self.env_directory) as it:
+            env_files = [
+                entry.path for entry in it
+                # glob ile aynı: gizli dosyalar (.env gibi) alınmaz
+                if entry.name.endswith('.env') and not entry.name.startswith('.')
+                and entry.is_file()
+            ]
         if not env_files:
             self.logger.warning(f"No .env files found in {self.env_directory}")
             return db_configs
 
-        for env_file in env_files:
-            env_vars = self.parse_env_file(env_file)
+        # Dosya okumaları paralel (I/O sırasında GIL bırakılır); doğrulama tek thread'de
+        with ThreadPoolExecutor(max_workers=min(32, len(env_files))) as executor:
+            parsed_env_files = list(executor.map(self.parse_env_file, env_files))
+
+        for env_file, env_vars in zip(env_files, parsed_env_files):
             if self._validate_db_config(env_vars):
                 db_config = self._extract_db_config(env_vars, env_file)
                 db_configs.append(db_config)